@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from datetime import datetime
@@ -7,12 +7,19 @@ import os
 from werkzeug.security import generate_password_hash, check_password_hash
 from botvoi import get_voice_input, generate_interview_report, llm, graph
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from tts import TTSService
 import tempfile
+import threading
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///interviews.db'
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['TTS_CACHE_FOLDER'] = os.getenv('TTS_CACHE_FOLDER', os.path.join('instance', 'tts_cache'))
+app.config['TTS_CACHE_MAX_BYTES'] = int(os.getenv('TTS_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+app.config['TTS_VOICE'] = os.getenv('TTS_VOICE')
+app.config['TTS_RATE'] = int(os.getenv('TTS_RATE')) if os.getenv('TTS_RATE') else None
+app.config['TTS_WAIT_SECONDS'] = float(os.getenv('TTS_WAIT_SECONDS', 2))
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
@@ -20,6 +27,23 @@ login_manager.login_view = 'login'
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Single TTS engine shared by all requests, with a disk cache of synthesized replies.
+# Created on first use so the debug reloader's parent process never starts one.
+_tts_service = None
+_tts_service_lock = threading.Lock()
+
+def get_tts_service():
+    global _tts_service
+    with _tts_service_lock:
+        if _tts_service is None:
+            _tts_service = TTSService(
+                app.config['TTS_CACHE_FOLDER'],
+                max_cache_bytes=app.config['TTS_CACHE_MAX_BYTES'],
+                voice=app.config['TTS_VOICE'],
+                rate=app.config['TTS_RATE']
+            )
+    return _tts_service
+
 # Database Models
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -168,6 +192,10 @@ def process_audio():
     interview.audio_path = audio_path
     db.session.commit()
     
+    # Start synthesizing the reply; the browser fetches it from /api/tts,
+    # or speaks it itself when server-side TTS is unavailable
+    tts_key = get_tts_service().submit(ai_response)
+    
     # Generate analysis
     analysis = {
         'tone': 0.8,  # Placeholder - implement actual tone analysis
@@ -175,11 +203,34 @@ def process_audio():
         'relevance': 0.9  # Placeholder - implement actual relevance analysis
     }
     
-    return jsonify({
+    result = {
         'transcription': transcription,
         'response': ai_response,
         'analysis': analysis
-    })
+    }
+    if tts_key:
+        result['audio_url'] = url_for('tts_audio', key=tts_key)
+    
+    return jsonify(result)
+
+@app.route('/api/tts/<key>')
+@login_required
+def tts_audio(key):
+    tts_service = get_tts_service()
+    audio_path = tts_service.get_audio_path(key, timeout=app.config['TTS_WAIT_SECONDS'])
+    if not audio_path:
+        if tts_service.is_pending(key):
+            # Still synthesizing; the client polls again instead of holding this thread
+            response = jsonify({'status': 'pending'})
+            response.headers['Retry-After'] = '1'
+            return response, 202
+        return jsonify({'error': 'Audio not found'}), 404
+    
+    # Clips can be evicted at any time, so let the browser revalidate instead of caching
+    response = send_file(os.path.abspath(audio_path), mimetype='audio/wav', conditional=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/end-interview/<int:interview_id>', methods=['POST'])
 @login_required
@@ -0,0 +1,320 @@
+# Offline bulk scoring of recorded interviews
+#
+# Usage:
+#   python batch_score.py recordings/ -o reports.jsonl -j 8
+#   python batch_score.py manifest.jsonl -o reports.jsonl --resume
+#
+# A directory input scores every audio file in it (recursively). A transcript
+# next to the audio with the same name is used instead of transcribing:
+#   <name>.json  chat history as stored by the web app ([{"type", "content"}, ...])
+#   <name>.txt   plain text of the candidate's answer
+#
+# A manifest input is a JSON Lines file with one recording per line:
+#   {"id": "...", "audio": "a.wav", "transcript": "a.json", "question": "..."}
+# Only "audio" is required; relative paths are resolved against the manifest.
+#
+# Each result is appended to the output as one JSON line and flushed right
+# away, so the output doubles as the checkpoint: with --resume, recordings
+# already scored successfully are skipped. Failed recordings are retried on
+# resume, so readers should keep the last record seen for each id.
+#
+# Grammar checks from every worker go to one shared LanguageTool server (a
+# Java process) started for the run, or to an existing one given with
+# --language-tool-server. Each worker still loads its own Whisper model and
+# SentenceTransformer, several hundred MB of RAM per worker, so lower -j on
+# machines with many cores and little memory.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm")
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Per-process state, set up once by _init_worker
+_whisper_model = None
+_whisper_model_name = "base"
+
+
+# Input discovery
+def _find_transcript(audio_path):
+    stem = os.path.splitext(audio_path)[0]
+    for ext in (".json", ".txt"):
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return None
+
+
+def iter_directory(input_dir):
+    """Yield a job for every audio file under input_dir"""
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            audio_path = os.path.join(root, name)
+            yield {
+                "id": os.path.relpath(audio_path, input_dir),
+                "audio": audio_path,
+                "transcript": _find_transcript(audio_path),
+                "question": None
+            }
+
+
+def iter_manifest(manifest_path):
+    """Yield a job for every line of a JSON Lines manifest"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "audio" not in entry:
+                raise ValueError(f"{manifest_path}:{line_no}: missing 'audio'")
+            audio_path = os.path.join(base_dir, entry["audio"])
+            transcript = entry.get("transcript")
+            yield {
+                "id": entry.get("id", entry["audio"]),
+                "audio": audio_path,
+                "transcript": os.path.join(base_dir, transcript) if transcript else None,
+                "question": entry.get("question")
+            }
+
+
+def iter_jobs(input_path):
+    if os.path.isdir(input_path):
+        return iter_directory(input_path)
+    return iter_manifest(input_path)
+
+
+# Checkpointing
+def load_checkpoint(output_path):
+    """Return ids already scored successfully in output_path.
+
+    A partial last line left by an interrupted run is truncated away so new
+    records are appended on a clean line.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "rb+") as f:
+        good_end = 0
+        for line in iter(f.readline, b""):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            good_end = f.tell()
+            if "error" not in record:
+                done.add(record["id"])
+        f.truncate(good_end)
+    return done
+
+
+# Worker side
+def _init_worker(whisper_model_name, language_tool_server):
+    global _whisper_model_name
+    _whisper_model_name = whisper_model_name
+    # tools.AnalysisTools connects to this instead of starting its own server
+    os.environ["LANGUAGE_TOOL_SERVER"] = language_tool_server
+    # Keep each worker's torch to one thread so workers do not oversubscribe
+    # the CPU
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _get_whisper_model():
+    global _whisper_model
+    if _whisper_model is None:
+        import whisper
+        _whisper_model = whisper.load_model(_whisper_model_name, device="cpu")
+    return _whisper_model
+
+
+def _load_chat_history(job):
+    """Return the job's conversation as a list of chat messages"""
+    from langchain_core.messages import HumanMessage, AIMessage
+
+    transcript = job["transcript"]
+    if transcript and transcript.endswith(".json"):
+        with open(transcript, encoding="utf-8") as f:
+            messages = json.load(f)
+        history = []
+        for msg in messages:
+            if msg.get("type") == "ai":
+                history.append(AIMessage(content=msg.get("content", "")))
+            elif msg.get("type") == "human":
+                history.append(HumanMessage(content=msg.get("content", "")))
+        return history
+
+    if transcript:
+        with open(transcript, encoding="utf-8") as f:
+            answer = f.read().strip()
+    else:
+        result = _get_whisper_model().transcribe(job["audio"], fp16=False)
+        answer = result["text"].strip()
+
+    history = []
+    if job["question"]:
+        history.append(AIMessage(content=job["question"]))
+    history.append(HumanMessage(content=answer))
+    return history
+
+
+def score_recording(job):
+    """Transcribe and analyze one recording, returning its report record.
+
+    Any analyzer failure turns the whole recording into an error record, so
+    placeholder scores are never saved as results and --resume retries it.
+    """
+    from tools import extract_qa_pairs, build_interview_report
+
+    start = time.time()
+    try:
+        qas = extract_qa_pairs(_load_chat_history(job))
+        if not qas:
+            raise ValueError("no answers found in transcript")
+        report = build_interview_report(job["audio"], qas, strict=True)
+        return {
+            "id": job["id"],
+            "audio": job["audio"],
+            "transcription": " ".join(answer for _, answer in qas),
+            "report": report,
+            "seconds": round(time.time() - start, 3)
+        }
+    except Exception as e:
+        return {
+            "id": job["id"],
+            "audio": job["audio"],
+            "error": str(e),
+            "seconds": round(time.time() - start, 3)
+        }
+
+
+# Driver
+def bounded_map(pool, fn, jobs, window):
+    """Yield fn(job) results from pool in completion order.
+
+    Jobs are pulled from the iterable lazily and at most `window` are
+    submitted at any time, so large archives are streamed rather than
+    queued up front.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    jobs = iter(jobs)
+    in_flight = set()
+    exhausted = False
+    while in_flight or not exhausted:
+        while not exhausted and len(in_flight) < window:
+            job = next(jobs, None)
+            if job is None:
+                exhausted = True
+                break
+            in_flight.add(pool.submit(fn, job))
+
+        if not in_flight:
+            break
+        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in finished:
+            yield future.result()
+
+
+def start_language_tool_server():
+    """Start the LanguageTool server shared by all workers.
+
+    Returns the server handle, to close() when done, and the URL workers
+    connect to as a remote server.
+    """
+    import language_tool_python
+
+    server = language_tool_python.LanguageTool("en-US")
+    # language_tool_python keeps the local server's address in _url as
+    # "http://host:port/v2/"; remote_server expects it without "v2/"
+    return server, server._url.rsplit("v2/", 1)[0]
+
+
+def run_batch(input_path, output_path, workers=DEFAULT_WORKERS, window=None,
+              whisper_model="base", resume=False, language_tool_server=None):
+    """Score every recording from input_path into output_path.
+
+    Workers check grammar against language_tool_server; when it is None a
+    local server is started for the run and shut down afterwards.
+    Returns (scored, failed) counts.
+    """
+    window = window or workers * 2
+
+    done = load_checkpoint(output_path) if resume else set()
+    if resume and done:
+        print(f"Resuming: {len(done)} recordings already scored")
+
+    scored = failed = 0
+    started = time.time()
+    jobs = (job for job in iter_jobs(input_path) if job["id"] not in done)
+
+    server = None
+    if language_tool_server is None:
+        server, language_tool_server = start_language_tool_server()
+
+    try:
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(whisper_model, language_tool_server)) as pool:
+            for record in bounded_map(pool, score_recording, jobs, window):
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                if "error" in record:
+                    failed += 1
+                    print(f"Failed {record['id']}: {record['error']}")
+                else:
+                    scored += 1
+
+                total = scored + failed
+                if total % 10 == 0:
+                    rate = total / (time.time() - started)
+                    print(f"Processed {total} recordings ({rate:.2f}/s)")
+    finally:
+        if server is not None:
+            server.close()
+
+    print(f"Done: {scored} scored, {failed} failed -> {output_path}")
+    return scored, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a directory or manifest of recorded interviews.")
+    parser.add_argument("input", help="directory of audio files or a JSON Lines manifest")
+    parser.add_argument("-o", "--output", default="reports.jsonl", help="JSON Lines file to write reports to")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"worker processes; each loads its own models (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--language-tool-server", default=None,
+                        help="URL of a running LanguageTool server (default: start one for this run)")
+    parser.add_argument("--window", type=int, default=None, help="max recordings in flight (default: 2 x workers)")
+    parser.add_argument("--whisper-model", default="base", help="Whisper model for recordings without a transcript")
+    parser.add_argument("--resume", action="store_true", help="skip recordings already scored in the output file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"input not found: {args.input}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.window is not None and args.window < 1:
+        parser.error("--window must be at least 1")
+
+    scored, failed = run_batch(args.input, args.output, args.workers, args.window,
+                               args.whisper_model, args.resume, args.language_tool_server)
+    return 1 if failed and not scored else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,7 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from typing import Annotated
 
-from tools import analyze_tone, analyze_grammar, analyze_relevance
+from tools import extract_qa_pairs, build_interview_report
 
 # Load API Key
 load_dotenv()
@@ -63,8 +63,14 @@ def get_voice_input(audio_path):
         return ""
 
 # Voice output
+_tts_engine = None
+
 def speak_text(text):
-    engine = pyttsx3.init()
+    # Reuse one engine; pyttsx3.init() is slow to run for every utterance
+    global _tts_engine
+    if _tts_engine is None:
+        _tts_engine = pyttsx3.init()
+    engine = _tts_engine
     engine.say(text)
     engine.runAndWait()
 
@@ -85,19 +91,12 @@ def generate_interview_report(audio_path, chat_history):
                     "feedback_samples": ["No audio available for analysis"]
                 },
                 "Relevance_Summary": {
-                    "average_score": 0.0,
+                    "average_score": None,
                     "individual_feedback": []
                 }
             }
 
-        qas = []
-        last_human = None
-        for msg in chat_history:
-            if isinstance(msg, HumanMessage):
-                last_human = msg.content
-            elif isinstance(msg, AIMessage) and last_human:
-                qas.append((msg.content, last_human))
-                last_human = None
+        qas = extract_qa_pairs(chat_history)
 
         if not qas:
             print("No Q&A pairs found in chat history")
@@ -112,67 +111,12 @@ def generate_interview_report(audio_path, chat_history):
                     "feedback_samples": ["No conversation data available"]
                 },
                 "Relevance_Summary": {
-                    "average_score": 0.0,
+                    "average_score": None,
                     "individual_feedback": []
                 }
             }
 
-        try:
-            tone_result = analyze_tone.invoke(audio_path)
-        except Exception as e:
-            print(f"Error in tone analysis: {str(e)}")
-            tone_result = {
-                "pitch": 0.5,
-                "intensity": 0.5,
-                "feedback": f"Tone analysis failed: {str(e)}"
-            }
-
-        total_grammar_errors = 0
-        grammar_feedback = []
-        total_relevance_score = 0
-        relevance_feedback = []
-
-        for question, response in qas:
-            try:
-                grammar_result = analyze_grammar.invoke(response)
-                total_grammar_errors += grammar_result.get("errors", 0)
-                grammar_feedback.extend(grammar_result.get("feedback", []))
-            except Exception as e:
-                print(f"Error in grammar analysis: {str(e)}")
-                grammar_feedback.append(f"Grammar analysis failed: {str(e)}")
-
-            try:
-                relevance_result = analyze_relevance.invoke({
-                    "transcription": response,
-                    "question": question
-                })
-                total_relevance_score += relevance_result.get("score", 0.0)
-                relevance_feedback.append({
-                    "question": question,
-                    "score": relevance_result.get("score", 0.0),
-                    "feedback": relevance_result.get("feedback", "")
-                })
-            except Exception as e:
-                print(f"Error in relevance analysis: {str(e)}")
-                relevance_feedback.append({
-                    "question": question,
-                    "score": 0.0,
-                    "feedback": f"Relevance analysis failed: {str(e)}"
-                })
-
-        avg_relevance = total_relevance_score / len(qas) if qas else 0
-        report = {
-            "Tone_Analysis": tone_result,
-            "Grammar_Summary": {
-                "total_errors": total_grammar_errors,
-                "feedback_samples": grammar_feedback[:5]
-            },
-            "Relevance_Summary": {
-                "average_score": avg_relevance,
-                "individual_feedback": relevance_feedback
-            }
-        }
-
+        report = build_interview_report(audio_path, qas)
         return report
     except Exception as e:
         print(f"Error generating interview report: {str(e)}")
@@ -187,7 +131,7 @@ def generate_interview_report(audio_path, chat_history):
                 "feedback_samples": [f"Report generation failed: {str(e)}"]
             },
             "Relevance_Summary": {
-                "average_score": 0.0,
+                "average_score": None,
                 "individual_feedback": []
             }
         }
@@ -13,7 +13,7 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from typing import Annotated
 
-from tools import analyze_tone, analyze_grammar, analyze_relevance
+from tools import extract_qa_pairs, build_interview_report
 
 # Load API Key
 load_dotenv()
@@ -61,8 +61,14 @@ def get_voice_input(save_path="user_response.wav"):
         return ""
 
 # Voice output
+_tts_engine = None
+
 def speak_text(text):
-    engine = pyttsx3.init()
+    # Reuse one engine; pyttsx3.init() is slow to run for every utterance
+    global _tts_engine
+    if _tts_engine is None:
+        _tts_engine = pyttsx3.init()
+    engine = _tts_engine
     engine.say(text)
     engine.runAndWait()
 
@@ -70,53 +76,17 @@ def speak_text(text):
 def generate_interview_report(audio_path, chat_history):
     print("\n📋 Generating Full Interview Feedback Report...")
 
-    qas = []
-    last_human = None
-    for msg in chat_history:
-        if isinstance(msg, HumanMessage):
-            last_human = msg.content
-        elif isinstance(msg, AIMessage) and last_human:
-            qas.append((msg.content, last_human))
-            last_human = None
+    qas = extract_qa_pairs(chat_history)
 
     if not qas:
         print("❗No Q&A pairs to analyze.")
         return
 
-    tone_result = analyze_tone.invoke(audio_path)
-
-    total_grammar_errors = 0
-    grammar_feedback = []
-    total_relevance_score = 0
-    relevance_feedback = []
-
-    for question, response in qas:
-        grammar_result = analyze_grammar.invoke(response)
-        total_grammar_errors += grammar_result.get("errors", 0)
-        grammar_feedback.extend(grammar_result.get("feedback", []))
-
-        relevance_result = analyze_relevance.invoke({
-            "transcription": response,
-            "question": question
-        })
-        total_relevance_score += relevance_result.get("score", 0.0)
-        relevance_feedback.append({
-            "question": question,
-            "score": relevance_result.get("score", 0.0),
-            "feedback": relevance_result.get("feedback", "")
-        })
-
-    avg_relevance = total_relevance_score / len(qas)
+    shared_report = build_interview_report(audio_path, qas)
     report = {
-        "Tone Analysis": tone_result,
-        "Grammar Summary": {
-            "total_errors": total_grammar_errors,
-            "feedback_samples": grammar_feedback[:5]
-        },
-        "Relevance Summary": {
-            "average_score": avg_relevance,
-            "individual_feedback": relevance_feedback
-        }
+        "Tone Analysis": shared_report["Tone_Analysis"],
+        "Grammar Summary": shared_report["Grammar_Summary"],
+        "Relevance Summary": shared_report["Relevance_Summary"]
     }
 
     print("\n📝 Full Interview Performance Report:")
@@ -0,0 +1,89 @@
+import importlib
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app modules live at the repository root rather than in a package
+sys.path.insert(0, ROOT)
+
+
+class FakeTool:
+    """Minimal stand-in for a langchain tool: invoke() calls the function"""
+
+    def __init__(self, func):
+        self.func = func
+
+    def invoke(self, args):
+        if isinstance(args, dict):
+            return self.func(**args)
+        return self.func(args)
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+def _stub_modules():
+    messages = types.ModuleType("langchain_core.messages")
+    messages.HumanMessage = type("HumanMessage", (FakeMessage,), {})
+    messages.AIMessage = type("AIMessage", (FakeMessage,), {})
+    lc_tools = types.ModuleType("langchain_core.tools")
+    lc_tools.tool = FakeTool
+    sentence_transformers = types.ModuleType("sentence_transformers")
+    sentence_transformers.SentenceTransformer = object
+    sentence_transformers.util = None
+    return {
+        "librosa": types.ModuleType("librosa"),
+        "numpy": types.ModuleType("numpy"),
+        "soundfile": types.ModuleType("soundfile"),
+        "language_tool_python": types.ModuleType("language_tool_python"),
+        "sentence_transformers": sentence_transformers,
+        "langchain_core": types.ModuleType("langchain_core"),
+        "langchain_core.messages": messages,
+        "langchain_core.tools": lc_tools,
+    }
+
+
+@pytest.fixture
+def tools_module(monkeypatch):
+    """Import tools.py, stubbing any heavy dependency that is not installed"""
+    for name, stub in _stub_modules().items():
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            monkeypatch.setitem(sys.modules, name, stub)
+
+    spec = importlib.util.spec_from_file_location("tools", os.path.join(ROOT, "tools.py"))
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "tools", module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def fake_analyzers(tools_module, monkeypatch):
+    """Replace the analyzers with cheap fakes; tests tweak `results` to change them.
+
+    "grammar_for", when set, picks the grammar result per transcription.
+    """
+    results = {
+        "tone": {"pitch": 0.3, "intensity": 0.4, "feedback": "Good tone"},
+        "grammar": {"errors": 1, "feedback": ["one issue"]},
+        "relevance": lambda transcription, question: (
+            {"score": 0.8, "feedback": "Highly relevant"}
+            if question in tools_module.IDEAL_ANSWERS
+            else {"score": None, "feedback": "No ideal answer defined"}
+        ),
+    }
+    monkeypatch.setattr(tools_module, "analyze_tone", FakeTool(lambda audio_file: results["tone"]))
+    monkeypatch.setattr(tools_module, "analyze_grammar", FakeTool(
+        lambda transcription: results.get("grammar_for", lambda _: results["grammar"])(transcription)))
+    monkeypatch.setattr(tools_module, "analyze_relevance", FakeTool(
+        lambda transcription, question: results["relevance"](transcription, question)))
+    return results
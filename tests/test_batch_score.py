@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import batch_score
+from batch_score import bounded_map, iter_directory, iter_manifest, load_checkpoint, main
+
+
+def test_checkpoint_skips_errors_and_truncates_partial_line(tmp_path):
+    output = tmp_path / "reports.jsonl"
+    good = json.dumps({"id": "a.wav", "report": {}}) + "\n"
+    failed = json.dumps({"id": "b.wav", "error": "Java not found"}) + "\n"
+    output.write_text(good + failed + '{"id": "c.wa')
+
+    done = load_checkpoint(str(output))
+
+    assert done == {"a.wav"}
+    assert output.read_text() == good + failed
+
+
+def test_checkpoint_missing_file(tmp_path):
+    assert load_checkpoint(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_manifest_paths_resolve_against_manifest(tmp_path, monkeypatch):
+    manifest = tmp_path / "cohort" / "manifest.jsonl"
+    manifest.parent.mkdir()
+    manifest.write_text(
+        json.dumps({"audio": "rec/a.wav", "transcript": "rec/a.json"}) + "\n"
+        "\n"
+        + json.dumps({"id": "bob", "audio": "b.wav", "question": "Tell me about yourself."}) + "\n"
+    )
+    monkeypatch.chdir(tmp_path)
+
+    jobs = list(iter_manifest(os.path.join("cohort", "manifest.jsonl")))
+
+    base = str(manifest.parent)
+    assert jobs == [
+        {"id": "rec/a.wav", "audio": os.path.join(base, "rec/a.wav"),
+         "transcript": os.path.join(base, "rec/a.json"), "question": None},
+        {"id": "bob", "audio": os.path.join(base, "b.wav"),
+         "transcript": None, "question": "Tell me about yourself."},
+    ]
+
+
+def test_manifest_requires_audio(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(json.dumps({"id": "x"}) + "\n")
+    with pytest.raises(ValueError):
+        list(iter_manifest(str(manifest)))
+
+
+def test_directory_finds_audio_and_sidecar_transcripts(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.wav", "a.txt", "notes.md", "sub/b.mp3", "sub/b.json"):
+        (tmp_path / name).write_text("x")
+
+    jobs = list(iter_directory(str(tmp_path)))
+
+    assert [job["id"] for job in jobs] == ["a.wav", os.path.join("sub", "b.mp3")]
+    assert jobs[0]["transcript"] == str(tmp_path / "a.txt")
+    assert jobs[1]["transcript"] == str(tmp_path / "sub" / "b.json")
+
+
+def test_bounded_map_limits_jobs_in_flight():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0, "pulled": 0}
+
+    def jobs():
+        for i in range(20):
+            with lock:
+                state["pulled"] += 1
+                # Never more than the window submitted ahead of completions
+                assert state["pulled"] - finished[0] <= 3
+            yield i
+
+    def work(i):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+        return i * 2
+
+    finished = [0]
+    results = []
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for result in bounded_map(pool, work, jobs(), window=3):
+            results.append(result)
+            finished[0] += 1
+
+    assert sorted(results) == [i * 2 for i in range(20)]
+    assert state["peak"] <= 3
+
+
+def test_bounded_map_accepts_any_iterable():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert sorted(bounded_map(pool, abs, range(-3, 0), window=2)) == [1, 2, 3]
+
+
+def test_bounded_map_rejects_empty_window():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with pytest.raises(ValueError):
+            list(bounded_map(pool, abs, [1], window=0))
+
+
+@pytest.mark.parametrize("flag", ["-j", "--window"])
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_cli_rejects_sizes_below_one(tmp_path, capsys, flag, value):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path), flag, value])
+    assert exc.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
+
+
+def make_job(tmp_path, name, transcript=None, question=None):
+    audio = tmp_path / (name + ".wav")
+    audio.write_text("x")
+    return {"id": name + ".wav", "audio": str(audio), "transcript": transcript, "question": question}
+
+
+def test_chat_history_from_json_transcript(tmp_path, tools_module):
+    transcript = tmp_path / "a.json"
+    transcript.write_text(json.dumps([
+        {"type": "system", "content": "You are an interviewer."},
+        {"type": "ai", "content": "Tell me about yourself."},
+        {"type": "human", "content": "I build web apps."},
+    ]))
+    job = make_job(tmp_path, "a", transcript=str(transcript), question="ignored")
+
+    history = batch_score._load_chat_history(job)
+
+    assert [(type(msg).__name__, msg.content) for msg in history] == [
+        ("AIMessage", "Tell me about yourself."),
+        ("HumanMessage", "I build web apps."),
+    ]
+
+
+def test_chat_history_from_text_transcript_and_question(tmp_path, tools_module):
+    transcript = tmp_path / "a.txt"
+    transcript.write_text("  I build web apps.\n")
+    job = make_job(tmp_path, "a", transcript=str(transcript), question="Tell me about yourself.")
+
+    history = batch_score._load_chat_history(job)
+
+    assert [(type(msg).__name__, msg.content) for msg in history] == [
+        ("AIMessage", "Tell me about yourself."),
+        ("HumanMessage", "I build web apps."),
+    ]
+
+
+def test_chat_history_transcribes_audio_without_transcript(tmp_path, tools_module, monkeypatch):
+    transcribed = []
+
+    class FakeWhisper:
+        def transcribe(self, audio_path, fp16):
+            transcribed.append(audio_path)
+            return {"text": " I build web apps. "}
+
+    monkeypatch.setattr(batch_score, "_get_whisper_model", lambda: FakeWhisper())
+    job = make_job(tmp_path, "a")
+
+    history = batch_score._load_chat_history(job)
+
+    assert transcribed == [job["audio"]]
+    assert [msg.content for msg in history] == ["I build web apps."]
+
+
+def test_score_recording_writes_report(tmp_path, fake_analyzers):
+    transcript = tmp_path / "a.txt"
+    transcript.write_text("I build web apps.")
+    job = make_job(tmp_path, "a", transcript=str(transcript), question="Tell me about yourself.")
+
+    record = batch_score.score_recording(job)
+
+    assert "error" not in record
+    assert record["transcription"] == "I build web apps."
+    assert record["report"]["Relevance_Summary"]["average_score"] == 0.8
+    assert record["report"]["Grammar_Summary"]["total_errors"] == 1
+
+
+def test_score_recording_turns_analyzer_failure_into_error(tmp_path, fake_analyzers):
+    fake_analyzers["tone"] = {"pitch": 0.5, "intensity": 0.5,
+                              "feedback": "Tone analysis failed: unreadable", "error": "unreadable"}
+    transcript = tmp_path / "a.txt"
+    transcript.write_text("I build web apps.")
+
+    record = batch_score.score_recording(make_job(tmp_path, "a", transcript=str(transcript)))
+
+    assert "report" not in record
+    assert "tone analysis failed" in record["error"]
+
+
+def test_failed_recordings_are_retried_on_resume(tmp_path, fake_analyzers, monkeypatch):
+    # Threads stand in for worker processes so the stubbed modules are shared
+    monkeypatch.setattr(batch_score, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setenv("LANGUAGE_TOOL_SERVER", "")
+    recordings = tmp_path / "rec"
+    recordings.mkdir()
+    for name in ("a", "b", "c"):
+        (recordings / (name + ".wav")).write_text("x")
+        (recordings / (name + ".txt")).write_text("answer " + name)
+    output = tmp_path / "reports.jsonl"
+
+    # Grammar fails for "b" on the first run only
+    fail_b = {"error": "no java"}
+    good_grammar = fake_analyzers["grammar"]
+    fake_analyzers["grammar_for"] = lambda transcription: (
+        dict(good_grammar, **fail_b) if transcription == "answer b" else good_grammar)
+
+    assert batch_score.run_batch(str(recordings), str(output), workers=2,
+                                 language_tool_server="http://lt.test") == (2, 1)
+    assert load_checkpoint(str(output)) == {"a.wav", "c.wav"}
+
+    fail_b.clear()
+    assert batch_score.run_batch(str(recordings), str(output), workers=2, resume=True,
+                                 language_tool_server="http://lt.test") == (1, 0)
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert records[-1]["id"] == "b.wav" and "error" not in records[-1]
+    assert load_checkpoint(str(output)) == {"a.wav", "b.wav", "c.wav"}
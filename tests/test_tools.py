@@ -0,0 +1,61 @@
+import pytest
+
+
+def test_answers_pair_with_the_preceding_question(tools_module):
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    history = [
+        HumanMessage(content="Hi, I'm ready."),
+        AIMessage(content="Tell me about yourself."),
+        HumanMessage(content="I build web apps."),
+        AIMessage(content="Why this role?"),
+        HumanMessage(content=""),
+        HumanMessage(content="It fits my goals."),
+    ]
+
+    assert tools_module.extract_qa_pairs(history) == [
+        ("", "Hi, I'm ready."),
+        ("Tell me about yourself.", "I build web apps."),
+        ("Why this role?", "It fits my goals."),
+    ]
+
+
+def test_unscorable_answers_are_left_out_of_the_average(tools_module, fake_analyzers):
+    report = tools_module.build_interview_report("a.wav", [
+        ("", "Hi, I'm ready."),
+        ("Tell me about yourself.", "I build web apps."),
+        ("Why this role?", "It fits my goals."),
+    ])
+
+    summary = report["Relevance_Summary"]
+    assert summary["average_score"] == 0.8
+    assert summary["scored_answers"] == 1
+    assert summary["unscored_answers"] == 2
+    assert [item["score"] for item in summary["individual_feedback"]] == [None, 0.8, None]
+
+
+def test_average_is_none_when_nothing_could_be_scored(tools_module, fake_analyzers):
+    report = tools_module.build_interview_report("a.wav", [("", "I build web apps.")], strict=True)
+
+    assert report["Relevance_Summary"]["average_score"] is None
+    assert report["Relevance_Summary"]["unscored_answers"] == 1
+
+
+def test_failed_relevance_is_not_scored(tools_module, fake_analyzers):
+    fake_analyzers["relevance"] = lambda transcription, question: {
+        "score": 0.0, "feedback": "Relevance analysis failed: boom", "error": "boom"}
+
+    report = tools_module.build_interview_report("a.wav", [("Tell me about yourself.", "Hi")])
+
+    assert report["Relevance_Summary"]["average_score"] is None
+
+
+def test_strict_report_raises_on_analyzer_failure(tools_module, fake_analyzers):
+    fake_analyzers["grammar"] = {"errors": 0, "feedback": ["Grammar analysis failed: no java"],
+                                 "error": "no java"}
+
+    lenient = tools_module.build_interview_report("a.wav", [("", "Hi")])
+    assert lenient["Grammar_Summary"]["feedback_samples"] == ["Grammar analysis failed: no java"]
+
+    with pytest.raises(tools_module.AnalysisError):
+        tools_module.build_interview_report("a.wav", [("", "Hi")], strict=True)
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+
+import pytest
+
+from tts import AudioCache, TTSService, cache_key
+
+
+class FakeEngine:
+    """Stands in for a pyttsx3 engine and writes a small WAV per utterance"""
+
+    def __init__(self, gate=None, header=b"RIFF\0\0\0\0WAVE"):
+        self.gate = gate
+        self.header = header
+        self.spoken = []
+        self._job = None
+
+    def setProperty(self, name, value):
+        pass
+
+    def save_to_file(self, text, path):
+        self._job = (text, path)
+
+    def runAndWait(self):
+        if self.gate:
+            self.gate.wait(5)
+        text, path = self._job
+        self.spoken.append(text)
+        with open(path, "wb") as f:
+            f.write(self.header + text.encode("utf-8"))
+
+
+def write_clip(cache_dir, key, size, mtime):
+    path = os.path.join(cache_dir, key + ".wav")
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    for key in ("a", "b"):
+        tmp = os.path.join(str(tmp_path), key + ".tmp.wav")
+        with open(tmp, "wb") as f:
+            f.write(b"x" * 100)
+        cache.put(key, tmp)
+
+    assert cache.get("a")  # "b" is now the least recently used
+    tmp = os.path.join(str(tmp_path), "c.tmp.wav")
+    with open(tmp, "wb") as f:
+        f.write(b"x" * 100)
+    cache.put("c", tmp)
+
+    assert cache.get("b") is None
+    assert not os.path.exists(cache.path_for("b"))
+    assert cache.get("a") and cache.get("c")
+
+
+def test_cache_restores_order_and_removes_partial_files(tmp_path):
+    now = time.time()
+    write_clip(str(tmp_path), "old", 100, now - 30)
+    write_clip(str(tmp_path), "new", 100, now - 10)
+    write_clip(str(tmp_path), "newest", 100, now)
+    partial = os.path.join(str(tmp_path), "interrupted.tmp.wav")
+    with open(partial, "wb") as f:
+        f.write(b"x")
+
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+
+    assert not os.path.exists(partial)
+    assert cache.get("old") is None
+    assert cache.get("new") and cache.get("newest")
+
+
+def test_duplicate_requests_share_one_synthesis(tmp_path):
+    gate = threading.Event()
+    engine = FakeEngine(gate=gate)
+    service = TTSService(str(tmp_path), engine_factory=lambda: engine)
+
+    first = service.synthesize("Tell me about yourself.")
+    second = service.synthesize("Tell me about yourself.")
+    assert first is second
+    assert service.is_pending(cache_key("Tell me about yourself."))
+
+    gate.set()
+    path = first.result(timeout=5)
+    assert engine.spoken == ["Tell me about yourself."]
+
+    # Served from cache afterwards without another synthesis
+    key = service.submit("Tell me about yourself.")
+    assert service.get_audio_path(key) == path
+    assert engine.spoken == ["Tell me about yourself."]
+
+
+def test_pending_clip_reports_pending_until_done(tmp_path):
+    gate = threading.Event()
+    service = TTSService(str(tmp_path), engine_factory=lambda: FakeEngine(gate=gate))
+
+    key = service.submit("Why this role?")
+    assert service.get_audio_path(key, timeout=0.01) is None
+    assert service.is_pending(key)
+
+    gate.set()
+    assert service.get_audio_path(key, timeout=5)
+    assert not service.is_pending(key)
+
+
+def test_engine_init_failure_disables_service(tmp_path):
+    def broken_engine():
+        raise RuntimeError("no speech driver")
+
+    service = TTSService(str(tmp_path), engine_factory=broken_engine)
+
+    assert not service.available
+    assert service.submit("Hello") is None
+    assert service.get_audio_path(cache_key("Hello"), timeout=0.01) is None
+
+
+def test_non_wav_output_is_rejected(tmp_path):
+    service = TTSService(str(tmp_path), engine_factory=lambda: FakeEngine(header=b"FORM\0\0\0\0AIFF"))
+
+    future = service.synthesize("Hello")
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_hung_engine_disables_service_until_it_returns(tmp_path):
+    gate = threading.Event()
+    service = TTSService(str(tmp_path), engine_factory=lambda: FakeEngine(gate=gate),
+                         synthesis_timeout=0.05)
+
+    stuck = service.synthesize("Hello")
+    queued_key = service.submit("Why this role?")
+    time.sleep(0.1)
+
+    assert service.get_audio_path(queued_key, timeout=0.01) is None
+    assert not service.available
+    assert not service.is_pending(queued_key)
+    assert service.submit("Another reply") is None
+    with pytest.raises(RuntimeError):
+        stuck.result(timeout=0)
+
+    # The engine returns from the overrunning job and the service resumes
+    gate.set()
+    wait_until(lambda: service.available)
+    future = service.synthesize("After recovery")
+    assert future.result(timeout=5)
+
+
+def test_repeated_timeouts_keep_service_off(tmp_path):
+    gate = threading.Event()
+    service = TTSService(str(tmp_path), engine_factory=lambda: FakeEngine(gate=gate),
+                         synthesis_timeout=0.05, max_timeouts=1)
+
+    key = service.submit("Hello")
+    time.sleep(0.1)
+    assert service.get_audio_path(key, timeout=0.01) is None
+
+    gate.set()
+    service._queue.join()
+    assert not service.available
+    assert service.submit("Hello again") is None
+
+
+def test_rate_changes_the_cache_key(tmp_path):
+    assert cache_key("Hello", rate=150) != cache_key("Hello", rate=200)
+
+    engine = FakeEngine()
+    slow = TTSService(str(tmp_path), rate=150, engine_factory=lambda: engine)
+    slow.synthesize("Hello").result(timeout=5)
+    fast = TTSService(str(tmp_path), rate=200, engine_factory=lambda: engine)
+    fast.synthesize("Hello").result(timeout=5)
+
+    # The clip cached at one rate is not served for the other
+    assert engine.spoken == ["Hello", "Hello"]
@@ -3,6 +3,7 @@ import numpy as np
 from sentence_transformers import SentenceTransformer, util
 import language_tool_python
 from langchain_core.tools import tool
+from langchain_core.messages import HumanMessage, AIMessage
 import soundfile as sf
 import warnings
 import os
@@ -32,13 +33,41 @@ def load_audio_file(audio_file):
         except Exception as e2:
             raise Exception(f"Failed to load audio file. SoundFile error: {str(e1)}, Librosa error: {str(e2)}")
 
+# Planned interview questions and the answers they are scored against
+IDEAL_ANSWERS = {
+    "Tell me about yourself.": "A concise summary of your background, skills, and goals relevant to the role."
+}
+
 class AnalysisTools:
     def __init__(self):
         self.st_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.grammar_tool = language_tool_python.LanguageTool('en-US')
-        self.ideal_answers = {
-            "Tell me about yourself.": "A concise summary of your background, skills, and goals relevant to the role."
-        }
+        # Share a running LanguageTool server when one is configured instead of
+        # starting a separate Java process here
+        self.grammar_tool = language_tool_python.LanguageTool(
+            'en-US', remote_server=os.getenv('LANGUAGE_TOOL_SERVER'))
+        self.ideal_answers = IDEAL_ANSWERS
+
+_analysis_tools = None
+
+def get_analysis_tools():
+    """Return the shared AnalysisTools, loading the models on first use"""
+    global _analysis_tools
+    if _analysis_tools is None:
+        _analysis_tools = AnalysisTools()
+    return _analysis_tools
+
+class AnalysisError(Exception):
+    """Raised by build_interview_report(strict=True) when an analyzer fails"""
+
+# Placeholder results for a failed analyzer; the "error" key marks them as failures
+def _tone_fallback(e):
+    return {"pitch": 0.5, "intensity": 0.5, "feedback": f"Tone analysis failed: {str(e)}", "error": str(e)}
+
+def _grammar_fallback(e):
+    return {"errors": 0, "feedback": [f"Grammar analysis failed: {str(e)}"], "error": str(e)}
+
+def _relevance_fallback(e):
+    return {"score": 0.0, "feedback": f"Relevance analysis failed: {str(e)}", "error": str(e)}
 
 @tool
 def analyze_tone(audio_file: str) -> dict:
@@ -65,20 +94,17 @@ def analyze_tone(audio_file: str) -> dict:
         }
     except Exception as e:
         print(f"Error in tone analysis: {str(e)}")
-        return {
-            "pitch": 0.5,
-            "intensity": 0.5,
-            "feedback": f"Tone analysis failed: {str(e)}"
-        }
+        return _tone_fallback(e)
 
 @tool
 def analyze_relevance(transcription: str, question: str) -> dict:
     """Score response relevance against an ideal answer."""
     try:
-        tools = AnalysisTools()
+        tools = get_analysis_tools()
         ideal_answer = tools.ideal_answers.get(question, "")
         if not ideal_answer:
-            return {"score": 0.0, "feedback": "No ideal answer defined"}
+            # Nothing to score against; None keeps it out of the averages
+            return {"score": None, "feedback": "No ideal answer defined"}
         embeddings = tools.st_model.encode([transcription, ideal_answer])
         score = float(util.cos_sim(embeddings[0], embeddings[1]).item())
         return {
@@ -87,17 +113,91 @@ def analyze_relevance(transcription: str, question: str) -> dict:
         }
     except Exception as e:
         print(f"Error in relevance analysis: {str(e)}")
-        return {"score": 0.0, "feedback": f"Relevance analysis failed: {str(e)}"}
+        return _relevance_fallback(e)
 
 @tool
 def analyze_grammar(transcription: str) -> dict:
     """Check transcription for grammatical errors."""
     try:
-        tools = AnalysisTools()
+        tools = get_analysis_tools()
         matches = tools.grammar_tool.check(transcription)
         return {
             "errors": len(matches),
             "feedback": [str(match) for match in matches] or ["No grammar issues detected"]
         }
     except Exception as e:
-        return {"error": str(e), "feedback": "Grammar analysis failed"}
\ No newline at end of file
+        print(f"Error in grammar analysis: {str(e)}")
+        return _grammar_fallback(e)
+
+def extract_qa_pairs(chat_history):
+    """Pair each answer with the interviewer message that preceded it"""
+    qas = []
+    last_question = ""
+    for msg in chat_history:
+        if isinstance(msg, AIMessage):
+            last_question = msg.content
+        elif isinstance(msg, HumanMessage) and msg.content:
+            qas.append((last_question, msg.content))
+    return qas
+
+def _run_analyzer(name, analyzer, args, fallback, strict):
+    try:
+        result = analyzer.invoke(args)
+    except Exception as e:
+        print(f"Error in {name} analysis: {str(e)}")
+        result = fallback(e)
+    if strict and "error" in result:
+        raise AnalysisError(f"{name} analysis failed: {result['error']}")
+    return result
+
+def build_interview_report(audio_path, qas, strict=False):
+    """Run every analyzer over a session's audio and Q&A pairs.
+
+    Failed analyzers contribute placeholder feedback to the report, or raise
+    AnalysisError when strict is set. Relevance average_score is None when no
+    answer could be scored.
+    """
+    tone_result = _run_analyzer("tone", analyze_tone, audio_path, _tone_fallback, strict)
+
+    total_grammar_errors = 0
+    grammar_feedback = []
+    total_relevance_score = 0
+    scored_answers = 0
+    relevance_feedback = []
+
+    for question, response in qas:
+        grammar_result = _run_analyzer("grammar", analyze_grammar, response, _grammar_fallback, strict)
+        total_grammar_errors += grammar_result.get("errors", 0)
+        grammar_feedback.extend(grammar_result.get("feedback", []))
+
+        relevance_result = _run_analyzer("relevance", analyze_relevance, {
+            "transcription": response,
+            "question": question
+        }, _relevance_fallback, strict)
+        # Answers with no ideal answer (or a failed analysis) have no real
+        # score and are left out of the average rather than counted as 0.0
+        score = relevance_result.get("score")
+        if "error" in relevance_result:
+            score = None
+        if score is not None:
+            total_relevance_score += score
+            scored_answers += 1
+        relevance_feedback.append({
+            "question": question,
+            "score": score,
+            "feedback": relevance_result.get("feedback", "")
+        })
+
+    return {
+        "Tone_Analysis": tone_result,
+        "Grammar_Summary": {
+            "total_errors": total_grammar_errors,
+            "feedback_samples": grammar_feedback[:5]
+        },
+        "Relevance_Summary": {
+            "average_score": total_relevance_score / scored_answers if scored_answers else None,
+            "scored_answers": scored_answers,
+            "unscored_answers": len(qas) - scored_answers,
+            "individual_feedback": relevance_feedback
+        }
+    }
\ No newline at end of file
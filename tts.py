@@ -0,0 +1,280 @@
+# Server-side text-to-speech with an on-disk cache of synthesized clips
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+AUDIO_EXTENSION = ".wav"
+TEMP_EXTENSION = ".tmp" + AUDIO_EXTENSION
+
+
+def cache_key(text, voice=None, rate=None):
+    """Return the cache key for text spoken with a given voice and rate"""
+    digest = hashlib.sha256()
+    digest.update((voice or "default").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(rate or "default").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.strip().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_wav_file(path):
+    """Check the RIFF/WAVE header, since some pyttsx3 drivers ignore the extension"""
+    with open(path, "rb") as f:
+        header = f.read(12)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+class AudioCache:
+    """LRU cache of synthesized clips stored as files in a directory"""
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> size in bytes, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+
+    def _load_existing(self):
+        # Rebuild recency order from file modification times
+        clips = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(TEMP_EXTENSION):
+                # Left over from a synthesis interrupted by a restart
+                os.remove(path)
+                continue
+            if not name.endswith(AUDIO_EXTENSION):
+                continue
+            stat = os.stat(path)
+            clips.append((stat.st_mtime, name[:-len(AUDIO_EXTENSION)], stat.st_size))
+        for _, key, size in sorted(clips):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + AUDIO_EXTENSION)
+
+    def temp_path_for(self, key):
+        return os.path.join(self.cache_dir, key + TEMP_EXTENSION)
+
+    def get(self, key):
+        """Return the clip path for key, or None on a miss"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            path = self.path_for(key)
+            try:
+                # Persist recency so the order survives a restart
+                os.utime(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(key)
+                return None
+            return path
+
+    def put(self, key, tmp_path):
+        """Move a freshly synthesized file into the cache and return its path"""
+        path = self.path_for(key)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep=None):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+
+class TTSService:
+    """Synthesizes speech on one long-lived engine owned by a worker thread.
+
+    pyttsx3 engines are not thread-safe and are expensive to create, so a
+    single engine is initialized once and every synthesis request is queued
+    to the thread that owns it. Request handlers get a Future back and never
+    block on synthesis unless they ask for the audio.
+
+    If the engine cannot be initialized (no pyttsx3 or no speech driver on
+    the server) the service stays unavailable and submit() returns None, so
+    callers can fall back to speaking in the browser. A job running past
+    synthesis_timeout makes the service unavailable the same way until the
+    engine returns; after max_timeouts such jobs in a row it stays off.
+    """
+
+    def __init__(self, cache_dir, max_cache_bytes=200 * 1024 * 1024, voice=None, rate=None,
+                 engine_factory=None, init_timeout=10, synthesis_timeout=30, max_timeouts=3):
+        self.cache = AudioCache(cache_dir, max_cache_bytes)
+        self.voice = voice
+        self.rate = rate
+        self.available = False
+        self._engine_factory = engine_factory
+        self.synthesis_timeout = synthesis_timeout
+        self.max_timeouts = max_timeouts
+        self._timeouts = 0  # consecutive jobs that overran synthesis_timeout
+        self._current = None  # (future, deadline) of the job the engine is running
+        self._queue = queue.Queue()
+        self._pending = {}  # key -> Future, so duplicate requests share one synthesis
+        # Guards the cache lookup + _pending check together with the worker's
+        # put + pop, so a finished clip is always visible in one of the two
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._worker.start()
+        if not self._ready.wait(init_timeout):
+            print("Speech synthesis engine did not start in time; TTS disabled until it does")
+            self._shutdown()
+
+    def submit(self, text, voice=None):
+        """Queue text for synthesis and return its cache key, or None if TTS is unavailable"""
+        if self.synthesize(text, voice) is None:
+            return None
+        return cache_key(text, voice or self.voice, self.rate)
+
+    def synthesize(self, text, voice=None):
+        """Return a Future resolving to the clip path for text, or None if TTS is unavailable"""
+        voice = voice or self.voice
+        key = cache_key(text, voice, self.rate)
+        self._check_deadline()
+
+        with self._lock:
+            path = self.cache.get(key)
+            if path:
+                future = Future()
+                future.set_result(path)
+                return future
+            if not self.available:
+                return None
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                self._queue.put((key, text, voice, future))
+        return future
+
+    def is_pending(self, key):
+        self._check_deadline()
+        with self._lock:
+            return key in self._pending
+
+    def get_audio_path(self, key, timeout=2):
+        """Return the clip path for key, waiting up to timeout for pending synthesis.
+
+        Returns None if the key is unknown, synthesis failed, or it is still
+        running after timeout (check is_pending to tell these apart).
+        """
+        with self._lock:
+            path = self.cache.get(key)
+            future = self._pending.get(key)
+        if path or future is None:
+            return path
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            self._check_deadline()
+            return None
+
+    def _run(self):
+        try:
+            if self._engine_factory is None:
+                import pyttsx3
+                engine = pyttsx3.init()
+            else:
+                engine = self._engine_factory()
+            if self.rate:
+                engine.setProperty("rate", self.rate)
+        except Exception as e:
+            print(f"Error initializing speech synthesis engine: {str(e)}")
+            self._shutdown()
+            return
+
+        with self._lock:
+            self.available = True
+        self._ready.set()
+        current_voice = None
+
+        while True:
+            key, text, voice, future = self._queue.get()
+            with self._lock:
+                if future.done():
+                    # Already failed by _shutdown while it sat in the queue
+                    self._queue.task_done()
+                    continue
+                self._current = (future, time.monotonic() + self.synthesis_timeout)
+            try:
+                if voice and voice != current_voice:
+                    engine.setProperty("voice", voice)
+                    current_voice = voice
+                tmp_path = self.cache.temp_path_for(key)
+                engine.save_to_file(text, tmp_path)
+                engine.runAndWait()
+                if not is_wav_file(tmp_path):
+                    os.remove(tmp_path)
+                    raise ValueError("speech engine did not produce a WAV file")
+                with self._lock:
+                    path = self.cache.put(key, tmp_path)
+                    self._finish(key, future, result=path)
+            except Exception as e:
+                print(f"Error in speech synthesis: {str(e)}")
+                with self._lock:
+                    self._finish(key, future, error=e)
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, key, future, result=None, error=None):
+        # Called with self._lock held once the engine returns from a job
+        self._current = None
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        if not future.done():
+            self._timeouts = 0
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        elif self._timeouts < self.max_timeouts:
+            # The job overran its deadline but the engine came back; take
+            # requests again unless it keeps hanging
+            self.available = True
+
+    def _check_deadline(self):
+        # The engine cannot be interrupted, so a job past its deadline means
+        # the only worker is stuck: fail everything waiting so clients fall
+        # back to browser speech instead of polling a hung engine
+        with self._lock:
+            current = self._current
+            if current is None or current[0].done() or time.monotonic() < current[1]:
+                return
+            self._timeouts += 1
+        print(f"Speech synthesis took longer than {self.synthesis_timeout}s; TTS disabled")
+        self._shutdown()
+
+    def _shutdown(self):
+        # Mark the service unavailable and fail everything still waiting
+        error = RuntimeError("speech synthesis is unavailable")
+        with self._lock:
+            self.available = False
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+        self._ready.set()